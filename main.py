@@ -1,7 +1,6 @@
 import sys
 import asyncio
 import os
-import shutil
 import logging
 from typing import List
 
@@ -11,15 +10,17 @@ if sys.platform.startswith("win"):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 # -----------------------------------------------------------
 
+import aiofiles
 from fastapi import FastAPI, UploadFile, File, BackgroundTasks, HTTPException
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
 # Import our modular components
-from src.ingestion import IngestionEngine, TextChunker
-from src.embedder import Embedder
-from src.vector_store import VectorStore
-from src.answer_engine import AnswerEngine
+from src.ingestion import IngestionEngine, TokenChunker
+from src.deps import get_embedder, get_vector_store
+from src._store_common import is_substantive
+from src.retriever import Retriever
+from src.answer_engine import AnswerEngine, GroqLLM
 
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
@@ -33,6 +34,10 @@ logger = logging.getLogger("AI_Pipeline")
 
 app = FastAPI(title="SaaS-Agent AI Pipeline")
 
+# --- Upload Settings ---
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "50")) * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 1 << 20  # Stream uploads to disk 1MB at a time
+
 # --- SERVE FRONTEND ---
 # This mounts the "static" folder to the root URL
 app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -44,10 +49,11 @@ async def read_root():
 
 # --- Initialize Components ---
 ingestion_engine = IngestionEngine()
-text_chunker = TextChunker() 
-embedder = Embedder()        
-vector_store = VectorStore() 
-answer_engine = AnswerEngine()
+text_chunker = TokenChunker()      # 256-token windows, 32-token overlap
+embedder = get_embedder()          # Shared singleton (model loaded once)
+vector_store = get_vector_store()  # Shared singleton (one DB client)
+retriever = Retriever(embedder, vector_store)
+answer_engine = AnswerEngine(retriever=retriever, llm=GroqLLM())
 
 # --- Data Models ---
 class QueryRequest(BaseModel):
@@ -66,27 +72,33 @@ async def process_file_background(file_path: str, filename: str):
     try:
         logger.info(f"Starting background processing for: {filename}")
         
-        # 1. Ingest (Load & Clean)
-        raw_docs = ingestion_engine.load_file(file_path)
+        # 1. Ingest (Load & Clean), on a worker thread: parsing is blocking and can take
+        # seconds for large PDFs, which would otherwise stall every other request
+        loop = asyncio.get_running_loop()
+        raw_docs = await loop.run_in_executor(None, ingestion_engine.load_file, file_path)
         logger.info(f"Loaded {len(raw_docs)} raw documents from {filename}")
         
-        # 2. Chunking
-        chunked_docs = text_chunker.chunk_documents(raw_docs)
+        # 2. Chunking. Near-empty chunks are dropped here, before paying for their
+        # forward pass (the store drops them too, as a backstop)
+        chunked_docs = [doc for doc in text_chunker.chunk_documents(raw_docs) if is_substantive(doc)]
         logger.info(f"Created {len(chunked_docs)} chunks")
         
         if not chunked_docs:
             logger.warning("No text extracted. Stopping.")
             return
 
-        # 3. Embedding (Heavy Compute)
+        # 3. Embedding (Heavy Compute, runs off the event loop)
         texts = [doc.content for doc in chunked_docs]
-        vectors = embedder.embed(texts)
+        vectors = await embedder.embed_batch_async(texts)
         logger.info(f"Generated {len(vectors)} vector embeddings")
         
         # 4. Store in Vector DB (Supabase)
         await vector_store.add_documents(chunked_docs, vectors)
         logger.info(f"Successfully stored data for {filename}")
 
+        # Cached answers may be stale now that the knowledge base changed
+        answer_engine.invalidate_cache()
+
     except Exception as e:
         logger.error(f"Error processing {filename}: {str(e)}")
     finally:
@@ -108,13 +120,27 @@ async def ingest_document(
     """
     Uploads a document (PDF, TXT, DOCX) and starts processing in the background.
     """
-    # 1. Save file temporarily
+    # Guard Clause: Reject oversized uploads before touching the disk (when the size is known)
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)}MB upload limit.")
+
+    # 1. Save file temporarily (streamed asynchronously so other requests keep being served)
     temp_dir = "temp_uploads"
     os.makedirs(temp_dir, exist_ok=True)
     temp_path = os.path.join(temp_dir, file.filename)
     
-    with open(temp_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    written = 0
+    async with aiofiles.open(temp_path, "wb") as buffer:
+        while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+            written += len(chunk)
+            if written > MAX_UPLOAD_BYTES:
+                break
+            await buffer.write(chunk)
+
+    # Guard Clause: The stream turned out to be larger than the limit
+    if written > MAX_UPLOAD_BYTES:
+        os.remove(temp_path)
+        raise HTTPException(status_code=413, detail=f"File exceeds the {MAX_UPLOAD_BYTES // (1024 * 1024)}MB upload limit.")
         
     # 2. Trigger the "Async Hook"
     background_tasks.add_task(process_file_background, temp_path, file.filename)
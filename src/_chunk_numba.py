@@ -0,0 +1,40 @@
+# Window-bound computation for the chunkers, JIT-compiled with Numba when available.
+from typing import List, Sequence
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    njit = None
+
+def _compute_windows_py(length: int, chunk_size: int, overlap: int) -> List[Sequence[int]]:
+    """
+    Pure-Python version: list of (start, end) window bounds over a sequence.
+    """
+    stride = chunk_size - overlap
+    return [(start, min(start + chunk_size, length)) for start in range(0, length, stride)]
+
+if njit is not None:
+    @njit(cache=True)
+    def _compute_windows_kernel(length: int, chunk_size: int, overlap: int) -> "np.ndarray":
+        """
+        Returns an (M, 2) int64 array of (start, end) window bounds over a sequence.
+        """
+        stride = chunk_size - overlap
+        count = (length + stride - 1) // stride
+        windows = np.empty((count, 2), dtype=np.int64)
+        for i in range(count):
+            start = i * stride
+            windows[i, 0] = start
+            windows[i, 1] = min(start + chunk_size, length)
+        return windows
+
+    def compute_windows(length: int, chunk_size: int, overlap: int) -> List[Sequence[int]]:
+        """
+        List of [start, end] window bounds over a sequence.
+        Converted with tolist() in one C call: callers slice with every pair, and
+        iterating the ndarray row by row would box two np.int64 scalars per window.
+        """
+        return _compute_windows_kernel(length, chunk_size, overlap).tolist()
+else:
+    compute_windows = _compute_windows_py
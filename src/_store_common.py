@@ -0,0 +1,42 @@
+import os
+import hashlib
+from typing import List, Tuple
+import numpy as np
+from numpy.typing import NDArray
+from src.interfaces import Document
+from dotenv import load_dotenv
+load_dotenv()
+
+# Helpers shared by the vector store backends (Chroma, usearch).
+
+# Size cap of each store's on-disk query-embedding cache
+EMBEDDING_CACHE_BYTES = int(os.getenv("EMBEDDING_CACHE_BYTES", str(2 << 30)))
+
+# Chunks with less stripped text than this are useless for retrieval and aren't stored
+# (matches the ingestion-time rule for whole files)
+MIN_CHUNK_CHARS = 10
+
+def chunk_id(doc: Document, index: int) -> str:
+    """
+    Stable ID from (source, chunk_index, content): re-ingesting the same file
+    produces the same IDs, so writes can be idempotent upserts.
+    """
+    key = f"{doc.metadata.get('source', '')}|{doc.metadata.get('chunk_index', index)}|".encode()
+    return hashlib.blake2b(key + doc.content.encode("utf-8", "ignore"), digest_size=16).hexdigest()
+
+def is_substantive(doc: Document) -> bool:
+    """
+    True when the chunk has at least MIN_CHUNK_CHARS of stripped text.
+    """
+    return len(doc.content.strip()) >= MIN_CHUNK_CHARS
+
+def drop_short_chunks(
+    documents: List[Document], embeddings: NDArray[np.float32]
+) -> Tuple[List[Document], NDArray[np.float32]]:
+    """
+    Removes documents under MIN_CHUNK_CHARS of content, together with their embedding rows.
+    """
+    keep = [i for i, doc in enumerate(documents) if is_substantive(doc)]
+    if len(keep) == len(documents):
+        return documents, embeddings
+    return [documents[i] for i in keep], embeddings[keep]
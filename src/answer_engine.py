@@ -1,13 +1,29 @@
 import os
-from typing import List
-from src.interfaces import BaseLLM, Document
+import hashlib
+from typing import List, Optional
+from src.interfaces import BaseLLM, Document, LLMError
 from src.retriever import Retriever
+from src.semantic_cache import SemanticCache
+from src.cache import LRUCache
 
 try:
     from groq import Groq
 except ImportError:
     Groq = None
 
+# Structured RAG prompt, filled in by AnswerEngine._construct_prompt
+PROMPT_TEMPLATE = """You are a helpful AI assistant. Use the following pieces of context to answer the user's question.
+If the answer is not in the context, say "I don't have enough information to answer that based on the provided documents."
+
+CONTEXT:
+{context}
+
+USER QUESTION: 
+{query}
+
+ANSWER:
+"""
+
 class GroqLLM(BaseLLM):
     """
     Adapter for the Groq API.
@@ -23,8 +39,9 @@ class GroqLLM(BaseLLM):
             print("Warning: GROQ_API_KEY not set or library missing. LLM running in MOCK mode.")
 
     async def generate(self, prompt: str) -> str:
+        # Guard Clause: MOCK mode has no real answer to give
         if not self.client:
-            return "Mock response: Groq API key is missing."
+            raise LLMError("Mock response: Groq API key is missing.")
 
         try:
             chat_completion = self.client.chat.completions.create(
@@ -39,16 +56,33 @@ class GroqLLM(BaseLLM):
             )
             return chat_completion.choices[0].message.content
         except Exception as e:
-            return f"Error communicating with Groq: {str(e)}"
+            raise LLMError(f"Error communicating with Groq: {str(e)}") from e
 
 class AnswerEngine:
     """
     The High-Level Manager. 
     It combines the Retriever and the LLM to answer questions (RAG).
     """
-    def __init__(self):
-        self.retriever = Retriever()
-        self.llm = GroqLLM()
+    def __init__(
+        self,
+        retriever: Optional[Retriever] = None,
+        llm: Optional[BaseLLM] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+    ):
+        self.retriever = retriever or Retriever()
+        self.llm = llm or GroqLLM()
+        # Answers for near-duplicate questions are served without retrieval or LLM calls
+        self.semantic_cache = semantic_cache if semantic_cache is not None else SemanticCache()
+        # Exact prompt -> answer, so identical query + context never hits the LLM twice
+        self.answer_cache = LRUCache(maxsize=1024)
+
+    def invalidate_cache(self) -> None:
+        """
+        Drops cached answers, e.g. after the knowledge base changes.
+        (Search results need no flush: VectorStore's result cache is keyed on a write generation.)
+        """
+        self.semantic_cache.clear()
+        self.answer_cache.clear()
 
     def _construct_prompt(self, query: str, context_docs: List[Document]) -> str:
         """
@@ -58,35 +92,40 @@ class AnswerEngine:
         context_text = "\n\n---\n\n".join([doc.content for doc in context_docs])
         
         # Structured Prompt
-        system_prompt = f"""You are a helpful AI assistant. Use the following pieces of context to answer the user's question.
-If the answer is not in the context, say "I don't have enough information to answer that based on the provided documents."
-
-CONTEXT:
-{context_text}
-
-USER QUESTION: 
-{query}
-
-ANSWER:
-"""
-        return system_prompt
+        return PROMPT_TEMPLATE.format_map({"context": context_text, "query": query})
 
     async def answer(self, query: str) -> str:
         """
-        End-to-end RAG pipeline: Query -> Retrieve -> Augment -> Generate
+        End-to-end RAG pipeline: Query -> (Cache) -> Retrieve -> Augment -> Generate
         """
         print(f"Analyzing query: {query}...")
         
-        # 1. Retrieve relevant documents
-        docs = await self.retriever.retrieve(query)
+        # 1. Embed the query and check for a semantically equivalent cached answer
+        query_vector = await self.retriever.embed_query(query)
+        cached = self.semantic_cache.lookup(query_vector)
+        if cached is not None:
+            print("Semantic cache hit.")
+            return cached.answer
+
+        # 2. Retrieve relevant documents
+        docs = await self.retriever.retrieve_by_vector(query_vector)
         
         if not docs:
             return "No relevant information found in the knowledge base."
 
-        # 2. Construct the prompt
+        # 3. Construct the prompt
         prompt = self._construct_prompt(query, docs)
         
-        # 3. Generate answer using Groq
-        response = await self.llm.generate(prompt)
+        # 4. Generate answer using Groq (skipped if this exact prompt was answered before)
+        prompt_key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        # Only real answers are cached; failures are reported but retried on the next call
+        response = self.answer_cache.get(prompt_key)
+        if response is None:
+            try:
+                response = await self.llm.generate(prompt)
+            except LLMError as e:
+                return str(e)
+            self.answer_cache.set(prompt_key, response)
         
-        return response
\ No newline at end of file
+        self.semantic_cache.insert(query_vector, docs, response)
+        return response
@@ -0,0 +1,69 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item requests into one batched call.
+
+    Callers await `submit(item)`. A background task drains the queue in
+    windows of up to `max_batch` items (waiting at most `max_wait_ms` for
+    stragglers) and hands each window to `process_batch`, which must return
+    one result per item, in the same order. An Exception instance in the
+    results is raised in that item's caller only.
+    """
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        self.process_batch = process_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Enqueues one item and waits for its individual result.
+        """
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    def _ensure_worker(self) -> None:
+        # Queue and worker are bound to the running loop, so (re)create them lazily
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+
+            # Give concurrent callers a short window to join this batch
+            if self._queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.max_wait)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            items = [item for item, _ in batch]
+            try:
+                results = await self.process_batch(items)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
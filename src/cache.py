@@ -0,0 +1,93 @@
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import numpy as np
+from numpy.typing import NDArray
+
+# Optional: persistent key/value store for the on-disk embedding cache
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+class LRUCache:
+    """
+    Small in-memory LRU map with an optional time-to-live (in seconds).
+    """
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Returns the cached value (marking it as recently used), or `default`.
+        """
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        value, created_at = item
+        if self.ttl is not None and time.monotonic() - created_at > self.ttl:
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Stores a value, evicting the least recently used entries beyond `maxsize`.
+        """
+        self._data[key] = (value, time.monotonic())
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+class DiskEmbeddingCache:
+    """
+    Persistent map of (model id, text) -> embedding, backed by diskcache (SQLite).
+    Vectors are stored as float16 bytes, half the size of float32 on disk.
+    Disabled (every lookup misses) if diskcache isn't installed.
+    """
+    def __init__(self, directory: str, model_id: str, size_limit: int = 2 << 30):
+        self.model_id = model_id
+        if diskcache:
+            self._store = diskcache.Cache(directory, size_limit=size_limit)
+        else:
+            print("Warning: 'diskcache' not installed. Embedding cache disabled.")
+            self._store = None
+
+    def _key(self, text: str) -> str:
+        # Keyed by model too: vectors from different models aren't comparable
+        return f"{self.model_id}:{hashlib.sha1(text.encode('utf-8', 'ignore')).hexdigest()}"
+
+    def get(self, text: str) -> Optional[NDArray[np.float32]]:
+        """
+        Returns the cached embedding for `text`, or None.
+        """
+        if self._store is None:
+            return None
+        raw = self._store.get(self._key(text))
+        if raw is None:
+            return None
+        return np.frombuffer(raw, dtype=np.float16).astype(np.float32)
+
+    def set(self, text: str, vector: NDArray[np.float32]) -> None:
+        """
+        Stores an embedding. All-zero vectors (mock mode / failed encodes) are never cached.
+        """
+        if self._store is None or not np.any(vector):
+            return
+        self._store.set(self._key(text), np.asarray(vector, dtype=np.float16).tobytes())
+
+    def close(self) -> None:
+        if self._store is not None:
+            self._store.close()
@@ -0,0 +1,41 @@
+import os
+from typing import Optional
+from src.interfaces import BaseVectorStore
+from src.embedder import Embedder
+from src.vector_store import VectorStore
+
+# Vector DB implementation: "chroma" (default) or "usearch" (in-process index, faster bulk ingest)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+
+# Shared, lazily-created components. Loading the embedding model or opening the
+# vector DB more than once wastes memory and adds seconds of startup latency.
+_embedder: Optional[Embedder] = None
+_vector_store: Optional[BaseVectorStore] = None
+
+def get_embedder() -> Embedder:
+    """
+    Returns the process-wide Embedder, loading the model on first use.
+    """
+    global _embedder
+    if _embedder is None:
+        _embedder = Embedder()
+    return _embedder
+
+def get_vector_store() -> BaseVectorStore:
+    """
+    Returns the process-wide vector store (selected by VECTOR_BACKEND), connecting on first use.
+    """
+    global _vector_store
+    if _vector_store is None:
+        # Tag the on-disk embedding cache with the model and backend, so switching either
+        # (including a fall back to mock vectors) never reuses stale vectors
+        embedder = get_embedder()
+        model_id = f"{embedder.model_name}:{embedder.backend}"
+        if VECTOR_BACKEND == "usearch":
+            from src.usearch_store import UsearchStore
+            _vector_store = UsearchStore(embed_model_id=model_id)
+        elif VECTOR_BACKEND == "chroma":
+            _vector_store = VectorStore(embed_model_id=model_id)
+        else:
+            raise ValueError(f"Unknown VECTOR_BACKEND '{VECTOR_BACKEND}'. Use 'chroma' or 'usearch'.")
+    return _vector_store
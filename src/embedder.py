@@ -1,5 +1,12 @@
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import List
+import numpy as np
+from numpy.typing import NDArray
 from src.interfaces import BaseEmbedder
+from src.batching import MicroBatcher
 
 # Try importing the local embedding library
 try:
@@ -7,41 +14,227 @@ try:
 except ImportError:
     SentenceTransformer = None
 
+try:
+    import torch
+except ImportError:
+    torch = None
+
+# Optional: ONNX Runtime backend (INT8-quantized, much faster on CPU)
+try:
+    import onnxruntime as ort
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+except ImportError:
+    ORTModelForFeatureExtraction = None
+
+# Where the exported + quantized ONNX models are cached between runs
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", "./onnx_models")
+
+# Output dimension of MiniLM (used for mock / fallback vectors)
+EMBEDDING_DIM = 384
+
+# MiniLM truncates inputs to this many tokens
+MAX_SEQ_LENGTH = 256
+
+# Token-length bucket bounds; each bucket is encoded separately so short texts
+# never get padded up to a long neighbour's length
+LENGTH_BUCKETS = (64, 128)
+
+# Blocking encode() calls run here, off the event loop. A single worker keeps
+# the model from being re-entered by concurrent callers.
+_embed_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedder")
+
 class Embedder(BaseEmbedder):
     """
     Concrete implementation using a generic, free, local model.
     This runs entirely on your machine (CPU or GPU).
     """
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        use_onnx: bool = True,
+        max_batch: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
         self.model_name = model_name
         self.model = None
-        
+        self.tokenizer = None
+        self.backend = "mock"
+
+        # Coalesces concurrent single-query calls into one encode() batch
+        self._batcher = MicroBatcher(self.embed_batch_async, max_batch=max_batch, max_wait_ms=max_wait_ms)
+
+        # Prefer the GPU when there is one
+        self.device = "cuda" if torch is not None and torch.cuda.is_available() else "cpu"
+
+        if self.device == "cuda" and SentenceTransformer:
+            # FP16 halves memory bandwidth and uses tensor cores; negligible loss for cosine retrieval
+            print(f"Loading FP16 embedding model on CUDA: {model_name}...")
+            self.model = SentenceTransformer(model_name, device=self.device)
+            self.model.half()
+            self.backend = "sentence-transformers"
+            print("Model loaded successfully.")
+            return
+
+        if use_onnx and ORTModelForFeatureExtraction:
+            print(f"Loading INT8 ONNX embedding model: {model_name}...")
+            try:
+                self._load_onnx_model(model_name)
+            except Exception as e:
+                # Export / download / quantization failures shouldn't take the app down
+                print(f"Warning: ONNX model load failed ({e}). Falling back to sentence-transformers.")
+                self.model = None
+                self.tokenizer = None
+            else:
+                self.backend = "onnx"
+                print("Model loaded successfully.")
+                return
+
         if SentenceTransformer:
             # This downloads a small, fast, high-quality model (~80MB)
             print(f"Loading local embedding model: {model_name}...")
             self.model = SentenceTransformer(model_name)
+            self.backend = "sentence-transformers"
             print("Model loaded successfully.")
         else:
             print("Warning: 'sentence-transformers' not installed. Embedder running in MOCK mode.")
 
-    def embed(self, texts: List[str]) -> List[List[float]]:
+    def embed(self, texts: List[str]) -> NDArray[np.float32]:
         """
         Generates embeddings for a list of texts.
+        Returns a float32 array of shape (len(texts), EMBEDDING_DIM).
         """
         if not texts:
-            return []
+            return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
 
         # 1. Mock Mode
         if not self.model:
             # Return dummy 384-dimensional vectors (standard for MiniLM)
-            return [[0.0] * 384 for _ in texts]
+            return np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
 
         # 2. Real Implementation (Local)
         try:
-            # encode() returns numpy arrays, convert to list for consistency
-            embeddings = self.model.encode(texts)
-            return embeddings.tolist()
+            # Smart batching: encode in token-length order, one length bucket at a time,
+            # so every batch pads to a similar (and bounded) length
+            lengths = self._token_lengths(texts)
+            order = np.argsort(lengths, kind="stable")
+            sorted_texts = [texts[i] for i in order]
+
+            if self._length_tokenizer() is not None:
+                bounds = np.searchsorted(lengths[order], LENGTH_BUCKETS).tolist()
+            else:
+                bounds = []  # Character lengths only: sort, but don't bucket
+            edges = [0, *bounds, len(texts)]
+
+            sorted_embeddings = np.concatenate([
+                self._encode(sorted_texts[start:end])
+                for start, end in zip(edges, edges[1:])
+                if end > start
+            ])
+
+            # Undo the sort so results line up with the input
+            embeddings = np.empty(sorted_embeddings.shape, dtype=np.float32)
+            embeddings[order] = sorted_embeddings
+            # Stay in numpy: a list of Python floats costs ~7x the memory
+            return embeddings
         
         except Exception as e:
             print(f"Error during embedding generation: {e}")
-            return [[0.0] * 384 for _ in texts]
\ No newline at end of file
+            return np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Runs the active backend on texts, returning normalized embeddings.
+        """
+        if self.backend == "onnx":
+            return self._encode_onnx(texts, batch_size=64)
+        embeddings = self.model.encode(
+            texts,
+            # FP16 on GPU leaves room for much larger batches
+            batch_size=128 if self.device == "cuda" else 64,
+            device=self.device,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        # Keep stored vectors float32 regardless of the model's precision
+        return embeddings.astype(np.float32, copy=False)
+
+    def _length_tokenizer(self):
+        if self.backend == "onnx":
+            return self.tokenizer
+        return getattr(self.model, "tokenizer", None)
+
+    def _token_lengths(self, texts: List[str]) -> np.ndarray:
+        """
+        Token count per text (capped at MAX_SEQ_LENGTH), or character count if no tokenizer is available.
+        """
+        tokenizer = self._length_tokenizer()
+        if tokenizer is None:
+            return np.array([len(t) for t in texts])
+
+        encoded = tokenizer(texts, truncation=True, max_length=MAX_SEQ_LENGTH, return_length=True)
+        return np.asarray(encoded["length"])
+
+    def _load_onnx_model(self, model_name: str) -> None:
+        """
+        Exports the model to ONNX and applies dynamic INT8 quantization (cached on disk).
+        """
+        hub_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        save_dir = Path(ONNX_CACHE_DIR) / hub_id.replace("/", "__")
+
+        if not (save_dir / "model_quantized.onnx").exists():
+            fp32_model = ORTModelForFeatureExtraction.from_pretrained(hub_id, export=True)
+            quantizer = ORTQuantizer.from_pretrained(fp32_model)
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+            quantizer.quantize(save_dir=save_dir, quantization_config=qconfig)
+            AutoTokenizer.from_pretrained(hub_id).save_pretrained(save_dir)
+
+        sess_options = ort.SessionOptions()
+        sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        sess_options.intra_op_num_threads = os.cpu_count() or 1
+
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            save_dir,
+            file_name="model_quantized.onnx",
+            provider="CPUExecutionProvider",
+            session_options=sess_options,
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(save_dir)
+
+    def _encode_onnx(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """
+        Replicates sentence-transformers' MiniLM pipeline: mean pooling + L2 normalization.
+        """
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=MAX_SEQ_LENGTH,
+                return_tensors="np",
+            )
+            token_embeddings = self.model(**inputs).last_hidden_state
+
+            # Mean pooling over real (non-padding) tokens
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None))
+
+        return np.concatenate(batches)
+
+    async def embed_async(self, text: str) -> NDArray[np.float32]:
+        """
+        Embeds a single text (e.g. a user query).
+        Concurrent calls are micro-batched into one forward pass.
+        """
+        return await self._batcher.submit(text)
+
+    async def embed_batch_async(self, texts: List[str]) -> NDArray[np.float32]:
+        """
+        Same as embed(), but runs on the embedder thread so the event loop isn't blocked.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_embed_executor, self.embed, texts)
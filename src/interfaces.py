@@ -1,6 +1,9 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 from dataclasses import dataclass
+import numpy as np
+from numpy.typing import NDArray
 
 @dataclass
 class Document:
@@ -19,15 +22,15 @@ class BaseEmbedder(ABC):
     Abstract Interface for Embedding Models.
     """
     @abstractmethod
-    def embed(self, texts: List[str]) -> List[List[float]]:
+    def embed(self, texts: List[str]) -> NDArray[np.float32]:
         """
-        Takes a list of strings and returns a list of vector embeddings.
+        Takes a list of strings and returns their vector embeddings.
         
         Args:
             texts (List[str]): List of text chunks to embed.
             
         Returns:
-            List[List[float]]: List of float vectors.
+            NDArray[np.float32]: Array of shape (len(texts), dim), one row per text.
         """
         pass
 
@@ -35,31 +38,67 @@ class BaseVectorStore(ABC):
     """
     Abstract Interface for Vector Database interactions.
     """
+    # Optional persistent query-embedding cache (see src.cache.DiskEmbeddingCache)
+    embedding_cache = None
+
     @abstractmethod
-    async def add_documents(self, documents: List[Document], embeddings: List[List[float]]) -> None:
+    async def add_documents(self, documents: List[Document], embeddings: NDArray[np.float32]) -> None:
         """
         Stores documents in the database.
         
         Args:
             documents (List[Document]): List of document objects.
-            embeddings (List[List[float]]): Corresponding vectors for the documents.
+            embeddings (NDArray[np.float32]): Array of shape (len(documents), dim), one row per document.
         """
         pass
 
     @abstractmethod
-    async def similarity_search(self, query_vector: List[float], limit: int = 5) -> List[Document]:
+    async def similarity_search(
+        self,
+        query_vector: NDArray[np.float32],
+        limit: int = 5,
+        search_ef: Optional[int] = None,
+    ) -> List[Document]:
         """
         Returns top-k documents similar to the query vector.
         
         Args:
-            query_vector (List[float]): The query embedding.
+            query_vector (NDArray[np.float32]): The query embedding, shape (dim,).
             limit (int): Number of results to return.
+            search_ef (Optional[int]): Per-query HNSW candidate list size (None = store default).
+                Lower is faster, higher has better recall. Stores without a per-query knob ignore it.
             
         Returns:
             List[Document]: The most similar documents.
         """
         pass
 
+    async def cached_embedding(
+        self,
+        text: str,
+        embed_fn: Callable[[str], Awaitable[NDArray[np.float32]]],
+    ) -> NDArray[np.float32]:
+        """
+        Returns the embedding of `text`, from the embedding cache when present,
+        otherwise by awaiting `embed_fn(text)` and caching the result.
+        """
+        if self.embedding_cache is None:
+            return await embed_fn(text)
+
+        # diskcache is SQLite-backed; keep its I/O off the event loop
+        loop = asyncio.get_running_loop()
+        vector = await loop.run_in_executor(None, self.embedding_cache.get, text)
+        if vector is None:
+            vector = await embed_fn(text)
+            await loop.run_in_executor(None, self.embedding_cache.set, text, vector)
+        return vector
+
+class LLMError(RuntimeError):
+    """
+    Raised by BaseLLM.generate when no real answer could be produced
+    (API failure, missing credentials). The message is safe to show to users.
+    """
+
 class BaseLLM(ABC):
     """
     Abstract Interface for Large Language Models.
@@ -74,37 +113,8 @@ class BaseLLM(ABC):
             
         Returns:
             str: The LLM's response text.
+
+        Raises:
+            LLMError: If the model could not produce an answer.
         """
         pass
-# from abc import ABC, abstractmethod
-# from typing import List, Dict, Any, Optional
-# from dataclasses import dataclass
-
-# @dataclass
-# class Document:
-#     """Standard data unit for the pipeline."""
-#     content: str
-#     metadata: Dict[str, Any]
-
-# class BaseEmbedder(ABC):
-#     @abstractmethod
-#     def embed(self, texts: List[str]) -> List[List[float]]:
-#         """Takes a list of strings and returns a list of vector embeddings."""
-#         pass
-
-# class BaseVectorStore(ABC):
-#     @abstractmethod
-#     async def add_documents(self, documents: List[Document]) -> None:
-#         """Stores documents in the database."""
-#         pass
-
-#     @abstractmethod
-#     async def similarity_search(self, query_vector: List[float], limit: int = 5) -> List[Document]:
-#         """Returns top-k documents similar to the query vector."""
-#         pass
-
-# class BaseLLM(ABC):
-#     @abstractmethod
-#     async def generate(self, prompt: str) -> str:
-#         """Generates a text response based on the prompt."""
-#         pass
\ No newline at end of file
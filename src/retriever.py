@@ -1,26 +1,54 @@
-from typing import List
-from src.interfaces import Document
+from typing import List, Optional
+import numpy as np
+from numpy.typing import NDArray
+from src.interfaces import BaseVectorStore, Document
 from src.embedder import Embedder
-from src.vector_store import VectorStore
+from src.deps import get_embedder, get_vector_store
+from src.cache import LRUCache
 
 class Retriever:
     """
     Orchestrates the retrieval pipeline: Query -> Embedding -> Vector Search
     """
-    def __init__(self):
-        self.embedder = Embedder()
-        self.vector_store = VectorStore()
+    def __init__(self, embedder: Optional[Embedder] = None, vector_store: Optional[BaseVectorStore] = None):
+        # Default to the shared singletons so the model is only loaded once
+        self.embedder = embedder or get_embedder()
+        self.vector_store = vector_store or get_vector_store()
 
-    async def retrieve(self, query: str, k: int = 5) -> List[Document]:
+        # Exact-match cache: query text -> embedding. Search results are not cached here;
+        # VectorStore caches them per query vector and invalidates them on every write.
+        self._query_emb_cache = LRUCache(maxsize=10000)
+
+    async def embed_query(self, query: str) -> NDArray[np.float32]:
+        """
+        Generates the vector for the query text.
+        Repeated queries skip the model (in-memory LRU, then the store's on-disk cache);
+        concurrent new ones are batched into a single forward pass.
+        """
+        query_vector = self._query_emb_cache.get(query)
+        if query_vector is None:
+            query_vector = await self.vector_store.cached_embedding(query, self.embedder.embed_async)
+            # All-zero vectors mean a failed encode (or MOCK mode); don't pin them for this text
+            if np.any(query_vector):
+                self._query_emb_cache.set(query, query_vector)
+        return query_vector
+
+    async def retrieve(self, query: str, k: int = 5, search_ef: Optional[int] = None) -> List[Document]:
         """
         1. Embed the user's query.
         2. Search the vector store for top-k similar documents.
+        `search_ef` trades latency for recall (see BaseVectorStore.similarity_search).
+        """
+        query_vector = await self.embed_query(query)
+        return await self.retrieve_by_vector(query_vector, k=k, search_ef=search_ef)
+
+    async def retrieve_by_vector(
+        self, query_vector: NDArray[np.float32], k: int = 5, search_ef: Optional[int] = None
+    ) -> List[Document]:
+        """
+        Searches the vector store with an already-computed query embedding.
         """
-        # Generate vector for the query text
-        # embed() returns a list of lists, we take the first one
-        query_vector = self.embedder.embed([query])[0]
-        
         # Search DB
-        documents = await self.vector_store.similarity_search(query_vector, limit=k)
+        documents = await self.vector_store.similarity_search(query_vector, limit=k, search_ef=search_ef)
         
-        return documents
\ No newline at end of file
+        return documents
@@ -0,0 +1,141 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+import numpy as np
+from src.interfaces import Document
+
+@dataclass
+class CacheEntry:
+    """
+    One cached RAG result.
+
+    Attributes:
+        vector (np.ndarray): L2-normalized query embedding.
+        docs (List[Document]): Documents retrieved for the query.
+        answer (str): The generated answer.
+        created_at (float): time.monotonic() timestamp of insertion.
+    """
+    vector: np.ndarray
+    docs: List[Document]
+    answer: str
+    created_at: float = field(default_factory=time.monotonic)
+
+class SemanticCache:
+    """
+    LRU cache of RAG answers keyed by query *meaning* rather than exact text.
+
+    Query vectors are hashed with random-projection LSH into a `num_bits` signature,
+    split into `num_bands` bands. Entries sharing at least one band with the query are
+    candidates; a candidate is a hit only if its cosine similarity clears
+    `similarity_threshold`. This keeps lookups O(1) instead of scanning every entry.
+    """
+    def __init__(
+        self,
+        dim: int = 384,
+        num_bits: int = 128,
+        num_bands: int = 16,
+        similarity_threshold: float = 0.95,
+        max_entries: int = 1024,
+        ttl: Optional[float] = 3600.0,
+        seed: int = 0,
+    ):
+        if num_bits % (8 * num_bands) != 0:
+            raise ValueError("num_bits must split into whole-byte bands.")
+
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((dim, num_bits)).astype(np.float32)
+        self.band_width = num_bits // 8 // num_bands
+        self.num_bands = num_bands
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries: "OrderedDict[bytes, CacheEntry]" = OrderedDict()
+        self._bands: List[Dict[bytes, Set[bytes]]] = [{} for _ in range(num_bands)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, query_vector) -> Optional[CacheEntry]:
+        """
+        Returns the most similar live entry above the threshold, or None.
+        """
+        vector = self._normalize(query_vector)
+        if vector is None:
+            return None
+
+        signature = self._signature(vector)
+        candidates = set()
+        for band, bucket in zip(self._band_keys(signature), self._bands):
+            candidates |= bucket.get(band, set())
+
+        best_key, best_score = None, self.similarity_threshold
+        for key in candidates:
+            entry = self._entries[key]
+            if self._expired(entry):
+                self._remove(key)
+                continue
+            score = float(entry.vector @ vector)
+            if score >= best_score:
+                best_key, best_score = key, score
+
+        if best_key is None:
+            return None
+
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key]
+
+    def insert(self, query_vector, docs: List[Document], answer: str) -> None:
+        """
+        Stores a result, evicting the least recently used entries beyond `max_entries`.
+        """
+        vector = self._normalize(query_vector)
+        if vector is None:
+            return
+
+        signature = self._signature(vector)
+        if signature in self._entries:
+            self._remove(signature)
+
+        self._entries[signature] = CacheEntry(vector=vector, docs=docs, answer=answer)
+        for band, bucket in zip(self._band_keys(signature), self._bands):
+            bucket.setdefault(band, set()).add(signature)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        """
+        Drops every entry (e.g. after new documents are ingested).
+        """
+        self._entries.clear()
+        for bucket in self._bands:
+            bucket.clear()
+
+    def _normalize(self, query_vector) -> Optional[np.ndarray]:
+        vector = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        # Zero vectors (e.g. mock embeddings) have no direction to compare
+        if norm == 0:
+            return None
+        return vector / norm
+
+    def _signature(self, vector: np.ndarray) -> bytes:
+        return np.packbits(vector @ self.planes > 0).tobytes()
+
+    def _band_keys(self, signature: bytes) -> List[bytes]:
+        w = self.band_width
+        return [signature[i * w:(i + 1) * w] for i in range(self.num_bands)]
+
+    def _expired(self, entry: CacheEntry) -> bool:
+        return self.ttl is not None and time.monotonic() - entry.created_at > self.ttl
+
+    def _remove(self, signature: bytes) -> None:
+        del self._entries[signature]
+        for band, bucket in zip(self._band_keys(signature), self._bands):
+            keys = bucket.get(band)
+            if keys is not None:
+                keys.discard(signature)
+                if not keys:
+                    del bucket[band]
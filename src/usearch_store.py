@@ -0,0 +1,201 @@
+import os
+import json
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Union
+import numpy as np
+from numpy.typing import NDArray
+from src.interfaces import BaseVectorStore, Document
+from src.cache import DiskEmbeddingCache
+from src._store_common import EMBEDDING_CACHE_BYTES, chunk_id, drop_short_chunks
+from dotenv import load_dotenv
+load_dotenv()
+
+# Try importing usearch
+try:
+    from usearch.index import Index
+except ImportError:
+    Index = None
+
+# Index file + SQLite sidecar (documents / metadata) live here
+USEARCH_DIR = os.getenv("USEARCH_DIR", "./usearch_db")
+
+# HNSW parameters (usearch names): graph connectivity, build-time and query-time candidate list sizes
+USEARCH_CONNECTIVITY = int(os.getenv("USEARCH_CONNECTIVITY", "24"))
+USEARCH_EXPANSION_ADD = int(os.getenv("USEARCH_EXPANSION_ADD", "128"))
+USEARCH_EXPANSION_SEARCH = int(os.getenv("USEARCH_EXPANSION_SEARCH", "100"))
+
+# Memory-map the saved index instead of loading it: the OS page cache keeps hot graph
+# nodes / vectors resident and evicts cold ones, so RSS no longer grows with the corpus.
+# Writes temporarily load the index into RAM, then re-map it after saving.
+USEARCH_VIEW = os.getenv("USEARCH_VIEW", "false").lower() in ("1", "true", "yes")
+
+# Precision of the stored vectors: "fp16" (default), "fp32" or "i8" (quarter of fp32, small recall loss)
+QUANTIZATION = os.getenv("EMBEDDING_QUANTIZATION", "fp16")
+_USEARCH_DTYPES = {"fp16": "f16", "fp32": "f32", "i8": "i8"}
+
+def _key(chunk_id: str) -> int:
+    """
+    usearch keys are integers: the first 63 bits of the content-derived chunk ID
+    (63, so the key also fits SQLite's signed INTEGER PRIMARY KEY).
+    """
+    return int(chunk_id[:16], 16) & ((1 << 63) - 1)
+
+class UsearchStore(BaseVectorStore):
+    """
+    Vector store on an in-process usearch HNSW index (SIMD distance kernels,
+    multi-threaded inserts), saved as a single file. Documents and metadata
+    live in a SQLite table keyed by the same integer key.
+
+    Select it with VECTOR_BACKEND=usearch. Unlike Chroma, inserts are never
+    persisted one batch at a time by the library: the index is saved once per
+    add_documents() call, which keeps bulk ingest linear.
+
+    With view=True (USEARCH_VIEW) the index file is memory-mapped read-only, which
+    suits read-heavy serving of indexes larger than RAM.
+    """
+    def __init__(
+        self,
+        ndim: int = 384,
+        quantize: str = QUANTIZATION,
+        embed_model_id: Optional[str] = None,
+        view: bool = USEARCH_VIEW,
+        path: str = USEARCH_DIR,
+    ):
+        if Index is None:
+            raise ImportError("usearch is required. Run: pip install usearch")
+
+        # Guard Clause: Unknown precision
+        if quantize not in _USEARCH_DTYPES:
+            raise ValueError(f"Unsupported quantization '{quantize}'. Use one of: {list(_USEARCH_DTYPES)}")
+
+        os.makedirs(path, exist_ok=True)
+        self.index_path = os.path.join(path, "usearch.idx")
+        self.view = view
+
+        # 1. Load / memory-map (or create) the index
+        self.index = Index(
+            ndim=ndim,
+            metric="cos",
+            dtype=_USEARCH_DTYPES[quantize],
+            connectivity=USEARCH_CONNECTIVITY,
+            expansion_add=USEARCH_EXPANSION_ADD,
+            expansion_search=USEARCH_EXPANSION_SEARCH,
+        )
+        if os.path.exists(self.index_path):
+            self._open_saved_index()
+
+        # 2. Open the document table. Every call runs on the single I/O thread below.
+        self.db = sqlite3.connect(os.path.join(path, "documents.sqlite3"), check_same_thread=False)
+        self.db.execute("CREATE TABLE IF NOT EXISTS chunks (key INTEGER PRIMARY KEY, content TEXT, metadata TEXT)")
+        self.db.commit()
+
+        # Blocking index / SQLite calls run here, off the event loop. One worker
+        # serializes writes against reads (usearch parallelizes each add() itself).
+        self._io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="usearch-io")
+
+        if embed_model_id:
+            self.embedding_cache = DiskEmbeddingCache(
+                os.path.join(path, ".embcache"), embed_model_id, EMBEDDING_CACHE_BYTES
+            )
+        print(f"✅ Connected to Local Vector Store (usearch) at {path} ({len(self.index)} vectors)")
+
+    async def add_documents(self, documents: List[Document], embeddings: Union[NDArray[np.float32], List[List[float]]]) -> None:
+        """
+        Adds documents and their vectors, then saves the index once.
+        Chunks already in the index (same content-derived key) are skipped.
+        """
+        if not documents:
+            return
+
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+        # Guard Clause: every document needs exactly one vector
+        if len(embeddings) != len(documents):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(documents)} documents.")
+
+        # Guard Clause: Skip empty / near-empty chunks
+        documents, embeddings = drop_short_chunks(documents, embeddings)
+        if not documents:
+            return
+
+        loop = asyncio.get_running_loop()
+        added = await loop.run_in_executor(self._io_pool, self._add, documents, embeddings)
+        print(f"Successfully stored {added} new chunks locally.")
+
+    def _add(self, documents: List[Document], embeddings: NDArray[np.float32]) -> int:
+        keys = np.fromiter((_key(chunk_id(doc, i)) for i, doc in enumerate(documents)), dtype=np.uint64, count=len(documents))
+
+        # Keep the first occurrence of each key, and only keys the index doesn't have yet
+        keys, first = np.unique(keys, return_index=True)
+        new = ~np.asarray(self.index.contains(keys), dtype=bool)
+        keys, rows = keys[new], first[new]
+        if not len(keys):
+            return 0
+
+        # A memory-mapped index is read-only: pull it into RAM for the insert
+        if self.view and os.path.exists(self.index_path):
+            self.index.load(self.index_path)
+
+        self.index.add(keys, embeddings[rows])
+        self.db.executemany(
+            "INSERT OR REPLACE INTO chunks (key, content, metadata) VALUES (?, ?, ?)",
+            [
+                (int(key), documents[row].content, json.dumps(documents[row].metadata))
+                for key, row in zip(keys.tolist(), rows.tolist())
+            ],
+        )
+        self.db.commit()
+        self.index.save(self.index_path)
+        if self.view:
+            self._open_saved_index()
+        return len(keys)
+
+    def _open_saved_index(self) -> None:
+        """
+        Memory-maps the saved index in view mode, otherwise loads it into RAM.
+        """
+        if self.view:
+            self.index.view(self.index_path)
+        else:
+            self.index.load(self.index_path)
+
+    async def similarity_search(
+        self,
+        query_vector: NDArray[np.float32],
+        limit: int = 5,
+        search_ef: Optional[int] = None,
+    ) -> List[Document]:
+        """
+        Returns the top-k documents for the query vector.
+        `search_ef` overrides expansion_search for this query (~40 fast, 100 default, ~200 high recall).
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io_pool, self._search, query_vector, limit, search_ef)
+
+    def _search(self, query_vector: NDArray[np.float32], limit: int, search_ef: Optional[int]) -> List[Document]:
+        # Guard Clause: Nothing indexed yet
+        if len(self.index) == 0:
+            return []
+
+        # Runs on the single I/O thread, so setting the index-wide value is race-free
+        self.index.expansion_search = search_ef or USEARCH_EXPANSION_SEARCH
+        matches = self.index.search(np.asarray(query_vector, dtype=np.float32).reshape(-1), limit)
+        keys = [int(key) for key in matches.keys]
+        if not keys:
+            return []
+
+        # One round-trip for all rows, then restore the ranking order
+        placeholders = ",".join("?" * len(keys))
+        rows = {
+            key: (content, metadata)
+            for key, content, metadata in self.db.execute(
+                f"SELECT key, content, metadata FROM chunks WHERE key IN ({placeholders})", keys
+            )
+        }
+        return [
+            Document(content=rows[key][0], metadata=json.loads(rows[key][1]))
+            for key in keys
+            if key in rows
+        ]
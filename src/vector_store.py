@@ -1,7 +1,19 @@
 import os
+import sys
 import uuid
-from typing import List
+import asyncio
+import hashlib
+import functools
+import contextlib
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple, Union
+import numpy as np
+from numpy.typing import NDArray
 from src.interfaces import BaseVectorStore, Document
+from src.batching import MicroBatcher
+from src.cache import LRUCache, DiskEmbeddingCache
+from src._store_common import EMBEDDING_CACHE_BYTES, chunk_id, drop_short_chunks
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -12,12 +24,68 @@ try:
 except ImportError:
     chromadb = None
 
+# Chunks written per collection.add() call (Chroma recommends 50-250)
+BATCH_SIZE = int(os.getenv("CHROMA_BATCH_SIZE", "100"))
+
+# Threads used for blocking Chroma (SQLite / HNSW) calls, so they never run on the event loop
+WRITE_WORKERS = int(os.getenv("CHROMA_WRITE_WORKERS", "4"))
+
+# HNSW index parameters. Only applied when the collection is first created.
+HNSW_M = int(os.getenv("HNSW_M", "24"))                  # Graph connectivity
+HNSW_EFC = int(os.getenv("HNSW_EFC", "128"))             # Build-time candidate list size
+HNSW_EFS = int(os.getenv("HNSW_EFS", "100"))             # Query-time candidate list size
+HNSW_NUM_THREADS = int(os.getenv("HNSW_NUM_THREADS", str(os.cpu_count() or 1)))  # Insert threads
+# Inserts buffered before they are indexed / before the index file is re-persisted to disk
+HNSW_BATCH_SIZE = int(os.getenv("HNSW_BATCH_SIZE", "10000"))
+HNSW_SYNC_THRESHOLD = int(os.getenv("HNSW_SYNC_THRESHOLD", "100000"))
+
+# On-disk query-embedding cache (used when the store is given an embedding model id)
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "./chroma_db/.embcache")
+
+# Batch size for bulk_add() when the client doesn't report its own maximum
+BULK_BATCH_SIZE = 5000
+
+# Metadata values repeated across every chunk of a file; interned so they share one string
+_INTERNED_METADATA_KEYS = ("source", "type")
+
+def _normalize_rows(vectors: NDArray[np.float32]) -> NDArray[np.float32]:
+    """
+    L2-normalizes each row (zero rows are left as-is).
+    """
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+def _vector_key(vector: NDArray[np.float32]) -> bytes:
+    """
+    Cache key for a query vector. Rounding the unit vector to 1/1024 steps folds
+    vectors that differ only by floating-point noise into the same key.
+    """
+    unit = _normalize_rows(np.asarray(vector, dtype=np.float32).reshape(-1))
+    return hashlib.blake2b(np.round(unit * 1024).astype(np.int16).tobytes(), digest_size=16).digest()
+
+def _upsert_batch(collection, ids, documents_text, metadatas, embeddings, start: int, stop: int) -> None:
+    """
+    Writes rows [start, stop). The slices are built here and dropped on return,
+    so a batch's payload lives only while it is being written.
+    """
+    collection.upsert(
+        ids=ids[start:stop],
+        documents=documents_text[start:stop],
+        embeddings=embeddings[start:stop],
+        metadatas=metadatas[start:stop]
+    )
+
 class VectorStore(BaseVectorStore):
     """
     Local implementation using ChromaDB.
     Saves data to a folder './chroma_db' in your project directory.
+
+    Vectors are L2-normalized on the way in (writes and queries), so the index
+    uses inner product, which equals cosine similarity for unit vectors but skips
+    the per-comparison norm computation. Never insert vectors that bypass
+    add_documents: mixing normalized and unnormalized rows breaks the ranking.
     """
-    def __init__(self):
+    def __init__(self, embed_model_id: Optional[str] = None):
         if not chromadb:
             raise ImportError("chromadb is required. Run: pip install chromadb")
         
@@ -27,49 +95,238 @@ class VectorStore(BaseVectorStore):
         # 2. Get or Create the collection (like a SQL table)
         self.collection = self.client.get_or_create_collection(
             name="documents",
-            metadata={"hnsw:space": "cosine"} # Use Cosine similarity
+            metadata={
+                "hnsw:space": "ip", # Inner product on unit vectors == cosine similarity
+                "hnsw:M": HNSW_M,
+                "hnsw:construction_ef": HNSW_EFC,
+                "hnsw:search_ef": HNSW_EFS,
+                "hnsw:num_threads": HNSW_NUM_THREADS,
+                # Buffer inserts in memory and persist the index less often
+                "hnsw:batch_size": HNSW_BATCH_SIZE,
+                "hnsw:sync_threshold": HNSW_SYNC_THRESHOLD,
+            }
         )
+        # 3. Never exceed the client's own per-call limit
+        get_max_batch_size = getattr(self.client, "get_max_batch_size", None)
+        self.max_batch_size = get_max_batch_size() if get_max_batch_size else BULK_BATCH_SIZE
+        self.batch_size = min(BATCH_SIZE, self.max_batch_size)
+        self._io_pool = ThreadPoolExecutor(max_workers=WRITE_WORKERS, thread_name_prefix="chroma-io")
+
+        # Staging collection of the bulk_ingest() block the current task is in, if any.
+        # A context variable, so writes from other tasks (e.g. a concurrent /ingest) are
+        # never staged, and never discarded along with a failed block.
+        self._staging = contextvars.ContextVar(f"chroma_staging_{id(self)}", default=None)
+
+        # Concurrent searches are coalesced into one multi-vector collection.query()
+        self._query_batcher = MicroBatcher(self._query_batch, max_batch=32, max_wait_ms=5.0)
+
+        # Repeated searches skip the HNSW walk. Keys include a write generation,
+        # so any write makes every older entry unreachable.
+        self._search_cache = LRUCache(maxsize=1024)
+        self._generation = 0
+
+        # Query embeddings persist across restarts, keyed by the model that produced them
+        if embed_model_id:
+            self.embedding_cache = DiskEmbeddingCache(EMBEDDING_CACHE_DIR, embed_model_id, EMBEDDING_CACHE_BYTES)
         print(f"✅ Connected to Local Vector Store (ChromaDB) at ./chroma_db")
 
-    async def add_documents(self, documents: List[Document], embeddings: List[List[float]]) -> None:
+    async def add_documents(self, documents: List[Document], embeddings: Union[NDArray[np.float32], List[List[float]]]) -> None:
         """
         Stores documents and vectors in Chroma.
+        `embeddings` is an (N, D) array with one row per document; it is handed to
+        Chroma in batches of array slices, without converting rows to Python lists.
+        """
+        await self._write(documents, embeddings, self.batch_size)
+
+    async def bulk_add(self, documents: List[Document], embeddings: Union[NDArray[np.float32], List[List[float]]]) -> None:
+        """
+        Ingest path for large corpora. Writes in the largest batches Chroma accepts, so
+        each HNSW insert is big enough for hnswlib to spread over all `hnsw:num_threads`
+        threads (small batches leave most of them idle).
+        """
+        await self._write(documents, embeddings, self.max_batch_size)
+
+    @contextlib.asynccontextmanager
+    async def bulk_ingest(self):
+        """
+        Stages every write made inside the block in an in-memory Chroma collection and
+        copies it into the persistent one in a few large upserts on exit, so the on-disk
+        index is rewritten once instead of repeatedly during the load.
+
+            async with store.bulk_ingest():
+                await store.add_documents(docs, vectors)
+
+        Only writes made by the task running the block (and tasks it starts) are staged;
+        other tasks keep writing straight to the persistent collection. Queries inside
+        the block only see previously persisted data. If the block raises, the staged
+        writes are discarded. Not re-entrant.
+
+        Trade-off: the staging collection builds its own HNSW graph, so every vector is
+        indexed twice (once in memory, once on flush). That only pays off when index
+        persistence dominates the load; with hnsw:sync_threshold already coalescing
+        persistence, plain bulk_add() is usually the cheaper choice.
         """
+        # Guard Clause: One staging area per task
+        if self._staging.get() is not None:
+            raise RuntimeError("bulk_ingest() is already active in this task.")
+
+        staging_client = chromadb.EphemeralClient()
+        staging = staging_client.create_collection(
+            name=f"bulk-{uuid.uuid4().hex}",
+            metadata=self.collection.metadata
+        )
+        try:
+            token = self._staging.set(staging)
+            try:
+                yield self
+            finally:
+                self._staging.reset(token)
+
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self._io_pool, self._flush_staging, staging)
+            finally:
+                # Even a partial flush changed the collection: drop cached search results
+                self._generation += 1
+        finally:
+            # Staged data is released whether the block or the flush succeeded or not
+            staging_client.delete_collection(staging.name)
+
+    def _flush_staging(self, staging) -> None:
+        """
+        Copies a staging collection into the persistent one.
+        Pages through it max_batch_size rows at a time, so only one page is in memory.
+        """
+        total = staging.count()
+        for offset in range(0, total, self.max_batch_size):
+            page = staging.get(
+                limit=self.max_batch_size,
+                offset=offset,
+                include=["embeddings", "documents", "metadatas"]
+            )
+            self.collection.upsert(
+                ids=page["ids"],
+                embeddings=page["embeddings"],
+                documents=page["documents"],
+                metadatas=page["metadatas"]
+            )
+        print(f"Flushed {total} staged chunks to ./chroma_db")
+
+    async def _write(
+        self,
+        documents: List[Document],
+        embeddings: Union[NDArray[np.float32], List[List[float]]],
+        batch_size: int,
+    ) -> None:
         if not documents:
             return
 
-        # Chroma requires unique IDs for every chunk
-        ids = [str(uuid.uuid4()) for _ in documents]
-        
-        # Prepare data structure
-        documents_text = [doc.content for doc in documents]
-        metadatas = [doc.metadata for doc in documents]
+        # One contiguous float32 block of unit vectors: batch slices below are zero-copy views.
+        # (Chroma stores float32, so holding fp16 here would only lose precision.)
+        embeddings = _normalize_rows(np.ascontiguousarray(embeddings, dtype=np.float32))
+
+        # Guard Clause: every document needs exactly one vector
+        if len(embeddings) != len(documents):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(documents)} documents.")
+
+        # Guard Clause: Skip empty / near-empty chunks (each would still cost an HNSW insert)
+        documents, embeddings = drop_short_chunks(documents, embeddings)
+        if not documents:
+            return
+
+        # Prepare data structure in one pass over the documents (pre-sized lists, no appends).
+        # Chroma requires unique IDs for every chunk (content-derived, so re-ingest is a no-op)
+        n = len(documents)
+        ids, documents_text, metadatas = [None] * n, [None] * n, [None] * n
+        for i, doc in enumerate(documents):
+            meta = doc.metadata
+            for key in _INTERNED_METADATA_KEYS:
+                value = meta.get(key)
+                if type(value) is str:
+                    meta[key] = sys.intern(value)
+            ids[i] = chunk_id(doc, i)
+            documents_text[i] = doc.content
+            metadatas[i] = meta
         
-        self.collection.add(
-            documents=documents_text,
-            embeddings=embeddings,
-            metadatas=metadatas,
-            ids=ids
-        )
+        # Write in fixed-size batches on the I/O pool, so the event loop keeps serving requests.
+        # Each batch is sliced by the worker that writes it, so only the batches currently
+        # in flight (at most WRITE_WORKERS) hold copies of the payload.
+        loop = asyncio.get_running_loop()
+        collection = self._staging.get()
+        if collection is None:
+            collection = self.collection
+        await asyncio.gather(*[
+            loop.run_in_executor(
+                self._io_pool, _upsert_batch, collection,
+                ids, documents_text, metadatas, embeddings, start, start + batch_size
+            )
+            for start in range(0, n, batch_size)
+        ])
+        self._generation += 1
         print(f"Successfully stored {len(documents)} chunks locally.")
 
-    async def similarity_search(self, query_vector: List[float], limit: int = 5) -> List[Document]:
+    async def similarity_search(
+        self,
+        query_vector: NDArray[np.float32],
+        limit: int = 5,
+        search_ef: Optional[int] = None,
+    ) -> List[Document]:
         """
         Query the local database.
+        Queries arriving within a few milliseconds of each other share one HNSW call.
+
+        `search_ef` is accepted for interface compatibility but ignored: Chroma has no
+        per-query ef, and changing the collection's hnsw:search_ef neither reaches the
+        already-loaded index nor stays scoped to one query. Tune HNSW_EFS instead.
         """
-        results = self.collection.query(
-            query_embeddings=[query_vector],
-            n_results=limit
-        )
+        key = (self._generation, _vector_key(query_vector), limit)
+        docs = self._search_cache.get(key)
+        if docs is None:
+            docs = await self._query_batcher.submit((query_vector, limit))
+            self._search_cache.set(key, docs)
+        return list(docs)
+
+    async def _query_batch(self, requests: List[Tuple[NDArray[np.float32], int]]) -> List[List[Document]]:
+        """
+        Runs a micro-batch of searches as one collection.query(). If the combined call
+        fails, each request is retried alone, so one bad request (e.g. a vector of the
+        wrong dimension) only fails its own caller.
+        """
+        try:
+            return await self._query(requests)
+        except Exception:
+            if len(requests) == 1:
+                raise
+
+        results = []
+        for request in requests:
+            try:
+                results.extend(await self._query([request]))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    async def _query(self, requests: List[Tuple[NDArray[np.float32], int]]) -> List[List[Document]]:
+        """
+        Runs a batch of (query_vector, limit) searches as a single collection.query().
+        """
+        query_embeddings = _normalize_rows(np.stack([
+            np.asarray(vector, dtype=np.float32).reshape(-1) for vector, _ in requests
+        ]))
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(self._io_pool, functools.partial(
+            self.collection.query,
+            query_embeddings=query_embeddings,
+            n_results=max(limit for _, limit in requests),
+            # Distances and embeddings aren't used; don't have Chroma load and return them
+            include=["documents", "metadatas"]
+        ))
         
-        # Parse results back into our generic Document format
-        docs = []
-        if results['documents']:
-            # results is a dictionary of lists (batch format)
-            retrieved_texts = results['documents'][0]
-            retrieved_metadatas = results['metadatas'][0]
-            
-            for text, meta in zip(retrieved_texts, retrieved_metadatas):
-                docs.append(Document(content=text, metadata=meta))
-                
-        return docs
\ No newline at end of file
+        # Parse results back into our generic Document format, one list per request
+        # (results is a dictionary of lists, one row per query)
+        if not results['documents']:
+            return [[] for _ in requests]
+        return [
+            list(map(Document, results['documents'][row][:limit], results['metadatas'][row][:limit]))
+            for row, (_, limit) in enumerate(requests)
+        ]
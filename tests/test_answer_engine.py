@@ -0,0 +1,39 @@
+import asyncio
+import numpy as np
+import pytest
+
+pytest.importorskip("dotenv")
+
+from src.answer_engine import AnswerEngine
+from src.interfaces import BaseLLM, Document, LLMError
+
+class StubRetriever:
+    async def embed_query(self, query):
+        return np.ones(384, dtype=np.float32)
+
+    async def retrieve_by_vector(self, query_vector, k=5):
+        return [Document(content="Paris is the capital of France.", metadata={"source": "a.txt"})]
+
+class FlakyLLM(BaseLLM):
+    """Fails on the first call, answers afterwards"""
+    def __init__(self):
+        self.calls = 0
+
+    async def generate(self, prompt):
+        self.calls += 1
+        if self.calls == 1:
+            raise LLMError("Error communicating with Groq: timeout")
+        return "Paris."
+
+def test_failed_generation_is_not_cached():
+    """An LLM error is returned to the caller but never served from either cache"""
+    llm = FlakyLLM()
+    engine = AnswerEngine(retriever=StubRetriever(), llm=llm)
+
+    assert asyncio.run(engine.answer("capital of France?")).startswith("Error communicating")
+    assert len(engine.answer_cache) == 0
+    assert len(engine.semantic_cache) == 0
+
+    assert asyncio.run(engine.answer("capital of France?")) == "Paris."
+    assert asyncio.run(engine.answer("capital of France?")) == "Paris."
+    assert llm.calls == 2
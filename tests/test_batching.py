@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+from src.batching import MicroBatcher
+
+def test_concurrent_submits_share_one_batch():
+    """Concurrent callers are coalesced and each gets its own result"""
+    calls = []
+
+    async def double(items):
+        calls.append(list(items))
+        return [i * 2 for i in items]
+
+    async def run():
+        batcher = MicroBatcher(double, max_batch=8, max_wait_ms=5)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8]
+    assert calls == [[0, 1, 2, 3, 4]]
+
+def test_batch_errors_propagate_to_callers():
+    """A failing batch raises in every waiting caller"""
+    async def boom(items):
+        raise RuntimeError("encode failed")
+
+    async def run():
+        batcher = MicroBatcher(boom)
+        await batcher.submit("query")
+
+    with pytest.raises(RuntimeError, match="encode failed"):
+        asyncio.run(run())
+
+def test_per_item_errors_stay_with_their_caller():
+    """An Exception returned for one item fails only that caller"""
+    async def checked(items):
+        return [ValueError(f"bad {i}") if i < 0 else i for i in items]
+
+    async def run():
+        batcher = MicroBatcher(checked)
+        return await asyncio.gather(batcher.submit(1), batcher.submit(-1), return_exceptions=True)
+
+    ok, failed = asyncio.run(run())
+    assert ok == 1
+    assert isinstance(failed, ValueError)
@@ -0,0 +1,40 @@
+import time
+import numpy as np
+import pytest
+from src.cache import LRUCache, DiskEmbeddingCache
+
+def test_lru_evicts_least_recently_used():
+    """Reading a key protects it from the next eviction"""
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+def test_ttl_expiry(monkeypatch):
+    """Entries older than the TTL read as misses"""
+    cache = LRUCache(ttl=10)
+    cache.set("q", "answer")
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert cache.get("q", "miss") == "miss"
+    assert len(cache) == 0
+
+def test_disk_embedding_cache_roundtrip(tmp_path):
+    """Embeddings survive a reopen, are scoped per model, and zero vectors aren't stored"""
+    pytest.importorskip("diskcache")
+    vector = np.linspace(-1, 1, 8, dtype=np.float32)
+
+    cache = DiskEmbeddingCache(str(tmp_path), model_id="model-a")
+    cache.set("hello", vector)
+    cache.set("mock", np.zeros(8, dtype=np.float32))
+    cache.close()
+
+    reopened = DiskEmbeddingCache(str(tmp_path), model_id="model-a")
+    np.testing.assert_allclose(reopened.get("hello"), vector, atol=1e-3)
+    assert reopened.get("mock") is None
+    assert DiskEmbeddingCache(str(tmp_path), model_id="model-b").get("hello") is None
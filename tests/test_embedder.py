@@ -0,0 +1,23 @@
+import src.embedder as embedder_module
+from src.embedder import Embedder
+
+def test_onnx_load_failure_falls_back(monkeypatch):
+    """A failed ONNX export / quantization drops to the next backend instead of crashing startup"""
+    def broken_load(self, model_name):
+        self.tokenizer = object()
+        raise OSError("quantizer failed")
+
+    class FakeSentenceTransformer:
+        def __init__(self, model_name, device=None):
+            self.model_name = model_name
+
+    monkeypatch.setattr(embedder_module, "torch", None)
+    monkeypatch.setattr(embedder_module, "ORTModelForFeatureExtraction", object)
+    monkeypatch.setattr(embedder_module, "SentenceTransformer", FakeSentenceTransformer)
+    monkeypatch.setattr(Embedder, "_load_onnx_model", broken_load)
+
+    embedder = Embedder()
+
+    assert embedder.backend == "sentence-transformers"
+    assert isinstance(embedder.model, FakeSentenceTransformer)
+    assert embedder.tokenizer is None
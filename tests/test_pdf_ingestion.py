@@ -0,0 +1,92 @@
+import pytest
+import src.ingestion as ingestion
+from src.ingestion import IngestionEngine
+
+def _write_pdf(path, pages):
+    """Writes a PDF with one line of text per page (skips the test without PyMuPDF)"""
+    fitz = pytest.importorskip("fitz")
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"This is the text of report section {i + 1}.")
+    doc.save(str(path))
+    doc.close()
+
+@pytest.fixture
+def fresh_pdf_pool(monkeypatch):
+    monkeypatch.setattr(ingestion, "_pdf_pool", None)
+    yield
+    if ingestion._pdf_pool is not None:
+        ingestion._pdf_pool.shutdown()
+
+def test_pymupdf_pages_load_in_order(tmp_path):
+    """PyMuPDF path: one Document per page, numbered from 1"""
+    path = tmp_path / "report.pdf"
+    _write_pdf(path, 3)
+
+    docs = IngestionEngine().load_file(str(path))
+
+    assert [doc.metadata["page"] for doc in docs] == [1, 2, 3]
+    assert docs[2].content == "This is the text of report section 3."
+
+def test_pypdf_parallel_ranges_keep_page_order(tmp_path, monkeypatch, fresh_pdf_pool):
+    """pypdf path: pages split across pool workers come back in page order"""
+    pytest.importorskip("pypdf")
+    path = tmp_path / "report.pdf"
+    _write_pdf(path, 5)
+    monkeypatch.setattr(ingestion, "fitz", None)
+    monkeypatch.setattr(ingestion, "PARALLEL_PDF_MIN_PAGES", 2)
+    monkeypatch.setattr(ingestion.os, "cpu_count", lambda: 2)
+
+    docs = IngestionEngine().load_file(str(path))
+
+    assert ingestion._pdf_pool is not None
+    assert [doc.metadata["page"] for doc in docs] == [1, 2, 3, 4, 5]
+    assert docs[3].content.endswith("section 4.")
+
+def test_pypdf_skips_pages_without_contents(tmp_path, monkeypatch):
+    """Blank pages (no /Contents stream) are never handed to the text extractor"""
+    pypdf = pytest.importorskip("pypdf")
+    source = tmp_path / "source.pdf"
+    _write_pdf(source, 2)
+    reader = pypdf.PdfReader(str(source))
+    writer = pypdf.PdfWriter()
+    writer.add_page(reader.pages[0])
+    writer.add_blank_page()
+    writer.add_page(reader.pages[1])
+    path = tmp_path / "with_blank.pdf"
+    with open(path, "wb") as f:
+        writer.write(f)
+
+    calls = []
+    extract_text = pypdf.PageObject.extract_text
+    monkeypatch.setattr(pypdf.PageObject, "extract_text", lambda self, *a, **k: calls.append(1) or extract_text(self, *a, **k))
+    monkeypatch.setattr(ingestion, "fitz", None)
+
+    pdf = ingestion._open_pdf(str(path))
+    page_texts = ingestion._extract_pages(pdf, 0, 3)
+
+    assert sorted(page_texts) == [0, 2]
+    assert len(calls) == 2
+
+def test_corrupt_page_is_skipped(monkeypatch):
+    """A page whose extraction raises is logged and skipped; the rest still load"""
+    class Page:
+        def __init__(self, text):
+            self.text = text
+
+        def get(self, key):
+            return "stream"
+
+        def extract_text(self):
+            if self.text is None:
+                raise ValueError("broken xref")
+            return self.text
+
+    class Reader:
+        pages = [Page("first page text"), Page(None), Page("third page text")]
+
+    monkeypatch.setattr(ingestion, "fitz", None)
+
+    page_texts = ingestion._extract_pages(Reader(), 0, 3)
+
+    assert page_texts == {0: "first page text", 2: "third page text"}
@@ -1,7 +1,8 @@
 import pytest
 import os
 from src.interfaces import Document
-from src.ingestion import IngestionEngine, TextChunker
+from src.ingestion import IngestionEngine, TextChunker, TokenChunker
+from src._chunk_numba import compute_windows
 
 # --- Fixtures ---
 
@@ -67,4 +68,55 @@ def test_metadata_validation(ingestion_engine):
     bad_doc = Document(content="Valid content", metadata={"type": "txt"})
     
     with pytest.raises(ValueError, match="missing required metadata keys"):
-        ingestion_engine._validate_document(bad_doc)
\ No newline at end of file
+        ingestion_engine._validate_document(bad_doc)
+
+def test_chunker_rejects_non_advancing_window():
+    """Test 6: Overlap >= chunk size would never terminate -> Raises ValueError"""
+    with pytest.raises(ValueError, match="chunk_overlap must be smaller"):
+        TextChunker(chunk_size=10, chunk_overlap=10)
+
+def test_token_chunker_splits_on_windows():
+    """Test 7: Token windows produce ordered, non-empty chunks"""
+    chunker = TokenChunker(tokens_per_chunk=8, overlap=2)
+    doc = Document(content="word " * 200, metadata={"source": "test", "type": "txt"})
+
+    chunks = chunker.chunk_documents([doc])
+
+    assert len(chunks) > 1
+    assert all(chunk.content for chunk in chunks)
+    assert [c.metadata['chunk_index'] for c in chunks] == list(range(len(chunks)))
+
+def test_compute_windows_bounds():
+    """Test 8: Window bounds step by size - overlap and clamp at the end"""
+    windows = [tuple(int(x) for x in w) for w in compute_windows(25, 10, 2)]
+    assert windows == [(0, 10), (8, 18), (16, 25), (24, 25)]
+    assert len(compute_windows(0, 10, 2)) == 0
+
+def test_bulk_metadata_validation_reports_bad_indices(ingestion_engine):
+    """Test 9: One pass over the batch, one error naming the offending documents"""
+    docs = [Document(content="Valid content", metadata={"source": "a", "type": "txt"}) for _ in range(4)]
+    docs[2] = Document(content="Valid content", metadata={"source": "a"})
+
+    with pytest.raises(ValueError, match=r"missing required metadata keys.*indices \[2\]"):
+        ingestion_engine._validate_documents(docs)
+
+def test_token_chunker_keeps_multibyte_characters_intact():
+    """Test 10: Window edges inside a multi-byte character never produce U+FFFD"""
+    pytest.importorskip("tiktoken")
+    chunker = TokenChunker(tokens_per_chunk=5, overlap=1)
+    doc = Document(content="日本語のテキスト、絵文字🙂も含む。" * 20, metadata={"source": "test", "type": "txt"})
+
+    chunks = chunker.chunk_documents([doc])
+
+    assert len(chunks) > 1
+    assert not any("\ufffd" in chunk.content for chunk in chunks)
+
+def test_numba_windows_match_pure_python():
+    """Test 11: The JIT kernel (when installed) returns the same plain-int windows as the fallback"""
+    pytest.importorskip("numba")
+    from src._chunk_numba import _compute_windows_py
+
+    for args in [(0, 10, 2), (25, 10, 2), (1000, 64, 8)]:
+        windows = compute_windows(*args)
+        assert [tuple(w) for w in windows] == _compute_windows_py(*args)
+        assert all(type(bound) is int for w in windows for bound in w)
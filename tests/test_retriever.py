@@ -0,0 +1,32 @@
+import asyncio
+import numpy as np
+import pytest
+
+pytest.importorskip("dotenv")
+
+from src.retriever import Retriever
+
+class FlakyEmbedder:
+    """Returns a zero vector (failed encode) on the first call, a real one afterwards"""
+    def __init__(self):
+        self.calls = 0
+
+    async def embed_async(self, text):
+        self.calls += 1
+        if self.calls == 1:
+            return np.zeros(4, dtype=np.float32)
+        return np.ones(4, dtype=np.float32)
+
+class StubStore:
+    async def cached_embedding(self, text, embed_fn):
+        return await embed_fn(text)
+
+def test_failed_query_embedding_is_not_cached():
+    """A zero vector from a failed encode is retried on the next call, real vectors are cached"""
+    embedder = FlakyEmbedder()
+    retriever = Retriever(embedder=embedder, vector_store=StubStore())
+
+    assert not np.any(asyncio.run(retriever.embed_query("q")))
+    assert np.all(asyncio.run(retriever.embed_query("q")) == 1)
+    assert np.all(asyncio.run(retriever.embed_query("q")) == 1)
+    assert embedder.calls == 2
@@ -0,0 +1,49 @@
+import time
+import numpy as np
+from src.semantic_cache import SemanticCache
+
+def _unit(v):
+    return v / np.linalg.norm(v)
+
+def test_near_duplicate_query_hits():
+    """A slightly perturbed query vector returns the cached answer"""
+    rng = np.random.default_rng(1)
+    cache = SemanticCache(dim=16)
+    base = _unit(rng.standard_normal(16))
+    cache.insert(base, docs=[], answer="cached")
+
+    near = _unit(base + 0.01 * rng.standard_normal(16))
+    entry = cache.lookup(near)
+    assert entry is not None and entry.answer == "cached"
+
+def test_unrelated_query_misses():
+    """Vectors below the similarity threshold are not served"""
+    cache = SemanticCache(dim=4)
+    cache.insert([1.0, 0.0, 0.0, 0.0], docs=[], answer="cached")
+    assert cache.lookup([0.0, 1.0, 0.0, 0.0]) is None
+
+def test_zero_vector_is_never_cached():
+    """Mock-mode (all-zero) embeddings have no direction to compare"""
+    cache = SemanticCache(dim=4)
+    cache.insert([0.0] * 4, docs=[], answer="cached")
+    assert len(cache) == 0
+
+def test_expired_entries_are_dropped(monkeypatch):
+    """Entries older than the TTL are evicted on lookup"""
+    cache = SemanticCache(dim=4, ttl=60)
+    cache.insert([1.0, 0.0, 0.0, 0.0], docs=[], answer="cached")
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert cache.lookup([1.0, 0.0, 0.0, 0.0]) is None
+    assert len(cache) == 0
+
+def test_lru_eviction():
+    """The least recently used entry goes first once full"""
+    cache = SemanticCache(dim=4, max_entries=2)
+    cache.insert([1.0, 0.0, 0.0, 0.0], docs=[], answer="a")
+    cache.insert([0.0, 1.0, 0.0, 0.0], docs=[], answer="b")
+    cache.lookup([1.0, 0.0, 0.0, 0.0])
+    cache.insert([0.0, 0.0, 1.0, 0.0], docs=[], answer="c")
+    assert cache.lookup([0.0, 1.0, 0.0, 0.0]) is None
+    assert cache.lookup([1.0, 0.0, 0.0, 0.0]).answer == "a"
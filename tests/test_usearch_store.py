@@ -0,0 +1,48 @@
+import asyncio
+import numpy as np
+import pytest
+
+pytest.importorskip("usearch")
+pytest.importorskip("dotenv")
+
+from src.interfaces import Document
+from src.usearch_store import UsearchStore
+
+def _docs_and_vectors():
+    docs = [
+        Document(content=f"Chunk number {i} about topic {i}.", metadata={"source": "a.txt", "type": "txt", "chunk_index": i})
+        for i in range(3)
+    ]
+    return docs, np.eye(3, 8, dtype=np.float32)
+
+def test_add_dedup_and_search_order(tmp_path):
+    """Re-adding the same chunks is a no-op, and results come back nearest first"""
+    store = UsearchStore(ndim=8, quantize="fp32", path=str(tmp_path))
+    docs, vectors = _docs_and_vectors()
+
+    async def run():
+        await store.add_documents(docs, vectors)
+        await store.add_documents(docs, vectors)
+        query = np.array([0.1, 1.0, 0.3, 0, 0, 0, 0, 0], dtype=np.float32)
+        return await store.similarity_search(query, limit=3)
+
+    results = asyncio.run(run())
+    assert len(store.index) == 3
+    assert [doc.metadata["chunk_index"] for doc in results] == [1, 2, 0]
+    assert results[0].content == docs[1].content
+
+def test_view_mode_reopens_and_accepts_writes(tmp_path):
+    """A memory-mapped index serves saved data and can still be written to"""
+    docs, vectors = _docs_and_vectors()
+    asyncio.run(UsearchStore(ndim=8, quantize="fp32", path=str(tmp_path)).add_documents(docs[:2], vectors[:2]))
+
+    viewed = UsearchStore(ndim=8, quantize="fp32", path=str(tmp_path), view=True)
+    assert len(viewed.index) == 2
+
+    async def run():
+        await viewed.add_documents(docs[2:], vectors[2:])
+        return await viewed.similarity_search(vectors[2], limit=1)
+
+    results = asyncio.run(run())
+    assert len(viewed.index) == 3
+    assert results[0].metadata["chunk_index"] == 2
@@ -0,0 +1,233 @@
+import asyncio
+import types
+import numpy as np
+import pytest
+
+pytest.importorskip("dotenv")
+
+import src.vector_store as vector_store_module
+from src._store_common import chunk_id, drop_short_chunks
+from src.interfaces import Document
+from src.vector_store import VectorStore, _vector_key
+
+class StubCollection:
+    """In-memory stand-in for a Chroma collection (inner-product search)"""
+    def __init__(self, name, metadata):
+        self.name = name
+        self.metadata = metadata
+        self.rows = {}
+        self.query_calls = []
+        self.upsert_sizes = []
+        self.fail_on_upsert = None
+
+    def upsert(self, ids, documents, embeddings, metadatas):
+        self.upsert_sizes.append(len(ids))
+        if self.fail_on_upsert == len(self.upsert_sizes):
+            raise RuntimeError("disk full")
+        for id_, doc, emb, meta in zip(ids, documents, embeddings, metadatas):
+            self.rows[id_] = (doc, np.asarray(emb, dtype=np.float32), meta)
+
+    def query(self, query_embeddings, n_results, include):
+        self.query_calls.append(len(query_embeddings))
+        rows = list(self.rows.values())
+        documents, metadatas = [], []
+        for query in query_embeddings:
+            ranked = sorted(rows, key=lambda row: -float(row[1] @ query))[:n_results]
+            documents.append([row[0] for row in ranked])
+            metadatas.append([row[2] for row in ranked])
+        return {"documents": documents, "metadatas": metadatas}
+
+    def modify(self, **kwargs):
+        raise AssertionError("search must not modify the collection")
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, limit, offset, include):
+        ids = list(self.rows)[offset:offset + limit]
+        return {
+            "ids": ids,
+            "documents": [self.rows[i][0] for i in ids],
+            "embeddings": [self.rows[i][1] for i in ids],
+            "metadatas": [self.rows[i][2] for i in ids],
+        }
+
+class StubClient:
+    def __init__(self, path=None):
+        self.collections = {}
+
+    def get_or_create_collection(self, name, metadata):
+        return self.collections.setdefault(name, StubCollection(name, metadata))
+
+    def create_collection(self, name, metadata):
+        assert name not in self.collections
+        return self.get_or_create_collection(name, metadata)
+
+    def delete_collection(self, name):
+        del self.collections[name]
+
+@pytest.fixture
+def ephemeral_clients():
+    return []
+
+@pytest.fixture
+def store(monkeypatch, ephemeral_clients):
+    def ephemeral_client():
+        client = StubClient()
+        ephemeral_clients.append(client)
+        return client
+
+    monkeypatch.setattr(vector_store_module, "chromadb", types.SimpleNamespace(
+        PersistentClient=StubClient, EphemeralClient=ephemeral_client
+    ))
+    return VectorStore()
+
+def _docs(n):
+    return [
+        Document(content=f"Chunk number {i} with enough text.", metadata={"source": "a.txt", "type": "txt", "chunk_index": i})
+        for i in range(n)
+    ]
+
+def test_chunk_id_is_stable_and_content_derived():
+    """Same chunk -> same ID; different content -> different ID"""
+    doc = _docs(1)[0]
+    same = Document(content=doc.content, metadata=dict(doc.metadata))
+    changed = Document(content=doc.content + "!", metadata=dict(doc.metadata))
+    assert chunk_id(doc, 0) == chunk_id(same, 5)
+    assert chunk_id(doc, 0) != chunk_id(changed, 0)
+
+def test_drop_short_chunks_keeps_embeddings_aligned():
+    """Dropped documents take their embedding rows with them"""
+    docs = _docs(3)
+    docs[1] = Document(content="  tiny  ", metadata={"source": "a.txt", "type": "txt"})
+    kept_docs, kept_vectors = drop_short_chunks(docs, np.arange(3, dtype=np.float32)[:, None])
+    assert kept_docs == [docs[0], docs[2]]
+    assert kept_vectors.ravel().tolist() == [0.0, 2.0]
+
+def test_vector_key_ignores_scale_and_noise():
+    """Keys depend on direction only, rounded past float noise"""
+    vector = np.linspace(-1, 1, 8, dtype=np.float32)
+    assert _vector_key(vector) == _vector_key(vector * 3 + 1e-6)
+    assert _vector_key(vector) != _vector_key(vector[::-1].copy())
+
+def test_concurrent_searches_share_one_query_and_trim_per_limit(store):
+    """Concurrent searches become one collection.query(); each caller gets its own limit"""
+    docs = _docs(3)
+
+    async def run():
+        await store.add_documents(docs, np.eye(3, 4, dtype=np.float32))
+        return await asyncio.gather(
+            store.similarity_search(np.array([1, 0, 0, 0], dtype=np.float32), limit=1),
+            store.similarity_search(np.array([0, 1, 0, 0], dtype=np.float32), limit=3, search_ef=40),
+        )
+
+    first, second = asyncio.run(run())
+    assert store.collection.query_calls == [2]
+    assert [d.metadata["chunk_index"] for d in first] == [0]
+    assert len(second) == 3 and second[0].metadata["chunk_index"] == 1
+
+def test_search_cache_is_invalidated_by_writes(store):
+    """Repeat searches are cached until the next write"""
+    docs = _docs(2)
+    query = np.array([0, 1, 0, 0], dtype=np.float32)
+
+    async def run():
+        await store.add_documents(docs[:1], np.eye(1, 4, dtype=np.float32))
+        before = await store.similarity_search(query, limit=2)
+        await store.similarity_search(query, limit=2)
+        await store.add_documents(docs[1:], np.eye(1, 4, k=1, dtype=np.float32))
+        after = await store.similarity_search(query, limit=2)
+        return before, after
+
+    before, after = asyncio.run(run())
+    assert store.collection.query_calls == [1, 1]
+    assert len(before) == 1
+    assert after[0].metadata["chunk_index"] == 1
+
+def test_bad_request_fails_only_its_caller(store):
+    """A malformed vector in a micro-batch doesn't fail the other searches"""
+    async def run():
+        await store.add_documents(_docs(1), np.eye(1, 4, dtype=np.float32))
+        return await asyncio.gather(
+            store.similarity_search(np.array([1, 0, 0, 0], dtype=np.float32)),
+            store.similarity_search(np.ones(3, dtype=np.float32)),
+            return_exceptions=True,
+        )
+
+    ok, failed = asyncio.run(run())
+    assert len(ok) == 1
+    assert isinstance(failed, Exception)
+
+def test_bulk_add_writes_in_max_size_batches(store):
+    """bulk_add uses the client's largest batch size, add_documents the small one"""
+    store.batch_size, store.max_batch_size = 2, 4
+    asyncio.run(store.bulk_add(_docs(6), np.ones((6, 4), dtype=np.float32)))
+    assert store.collection.upsert_sizes == [4, 2]
+
+def test_bulk_ingest_stages_then_flushes_in_pages(store, ephemeral_clients):
+    """Writes inside the block are staged, then copied over page by page and the staging dropped"""
+    store.max_batch_size = 2
+
+    async def run():
+        async with store.bulk_ingest():
+            await store.add_documents(_docs(5), np.ones((5, 4), dtype=np.float32))
+            assert store.collection.count() == 0
+
+    asyncio.run(run())
+    staging_client, = ephemeral_clients
+    assert store.collection.count() == 5
+    assert store.collection.upsert_sizes == [2, 2, 1]
+    assert staging_client.collections == {}
+
+def test_bulk_ingest_discards_on_error_and_scopes_to_task(store, ephemeral_clients):
+    """A failing block drops its staged writes; a concurrent task's write goes straight through"""
+    docs = _docs(3)
+
+    async def run():
+        block_active, outside_done = asyncio.Event(), asyncio.Event()
+
+        async def outside_write():
+            await block_active.wait()
+            await store.add_documents(docs[2:], np.ones((1, 4), dtype=np.float32))
+            outside_done.set()
+
+        task = asyncio.get_running_loop().create_task(outside_write())
+        try:
+            async with store.bulk_ingest():
+                await store.add_documents(docs[:2], np.ones((2, 4), dtype=np.float32))
+                block_active.set()
+                await outside_done.wait()
+                raise ValueError("parse failed")
+        finally:
+            await task
+
+    with pytest.raises(ValueError, match="parse failed"):
+        asyncio.run(run())
+    assert list(store.collection.rows) == [chunk_id(docs[2], 2)]
+    assert ephemeral_clients[0].collections == {}
+
+def test_bulk_ingest_is_not_reentrant(store):
+    """Nesting bulk_ingest in one task is rejected"""
+    async def run():
+        async with store.bulk_ingest():
+            async with store.bulk_ingest():
+                pass
+
+    with pytest.raises(RuntimeError, match="already active"):
+        asyncio.run(run())
+
+def test_partial_flush_still_drops_staging_and_search_cache(store, ephemeral_clients):
+    """A flush failing midway releases the staging and invalidates cached searches"""
+    store.max_batch_size = 2
+    store.collection.fail_on_upsert = 2
+    generation = store._generation
+
+    async def run():
+        async with store.bulk_ingest():
+            await store.add_documents(_docs(4), np.ones((4, 4), dtype=np.float32))
+
+    with pytest.raises(RuntimeError, match="disk full"):
+        asyncio.run(run())
+    assert store.collection.count() == 2
+    assert store._generation > generation + 1
+    assert ephemeral_clients[0].collections == {}